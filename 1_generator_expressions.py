@@ -30,9 +30,6 @@ def example_1():
     print(iterator)
 
 
-example_1()
-
-
 @example
 def example_2():
     """
@@ -47,9 +44,6 @@ def example_2():
     print(next(iterator))
 
 
-example_2()
-
-
 @example
 def example_3():
     """
@@ -65,9 +59,6 @@ def example_3():
         print_exception(exc)
 
 
-example_3()
-
-
 @example
 def example_4():
     """
@@ -83,9 +74,6 @@ def example_4():
         print(f'A square: {i}')
 
 
-example_4()
-
-
 @example
 def example_5():
     """
@@ -109,4 +97,6 @@ def example_5():
     print(*list(replaced), sep='')
 
 
-example_5()
+if __name__ == '__main__':
+    from examples import main
+    raise SystemExit(main(default=__file__))
@@ -45,9 +45,6 @@ def example_1():
         print_exception(exc)
 
 
-example_1()
-
-
 @example
 def example_2():
     """
@@ -68,9 +65,6 @@ def example_2():
         print_exception(exc)
 
 
-example_2()
-
-
 @example
 def example_3():
     """
@@ -85,9 +79,6 @@ def example_3():
     print(list(generator()))
 
 
-example_3()
-
-
 @example
 def example_4():
     """
@@ -150,4 +141,35 @@ def example_4():
     print(*[x['name'] for x in adults][:10], sep='\n')
 
 
-example_4()
+def lines(filename):
+    with open(filename, mode='r', encoding='UTF-8') as file:
+        yield from iter(file)
+
+
+def tokens(stream):
+    tokens = ('name', 'class', 'age', 'sex', 'survived')
+    for item in stream:
+        name, *values = item.strip().rsplit(',', maxsplit=4)
+
+        last, _, first = name.strip('"').partition(', ')
+        name = f'{first} {last}'
+
+        yield dict(zip(tokens, (name, *values)))
+
+
+def where(key, value, stream):
+    for item in stream:
+        if item[key] == value:
+            yield item
+
+
+def nvl(key, default, stream):
+    for item in stream:
+        if not item[key]:
+            item[key] = default
+        yield item
+
+
+if __name__ == '__main__':
+    from examples import main
+    raise SystemExit(main(default=__file__))
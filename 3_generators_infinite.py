@@ -30,4 +30,6 @@ def example_1():
         print(f'{i}-th prime is {next(generator)}')
 
 
-example_1()
+if __name__ == '__main__':
+    from examples import main
+    raise SystemExit(main(default=__file__))
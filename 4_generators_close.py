@@ -42,9 +42,6 @@ def example_1():
         print_exception(err)
 
 
-example_1()
-
-
 @example
 def example_2():
     """
@@ -90,9 +87,6 @@ def example_2():
     gen.close()
 
 
-example_2()
-
-
 @example
 def example_3():
     """
@@ -147,9 +141,6 @@ def example_3():
         print_exception(err)
 
 
-example_3()
-
-
 @example
 def example_4():
     """
@@ -176,9 +167,6 @@ def example_4():
         print_exception(err)
 
 
-example_4()
-
-
 @example
 def example_5():
     """Перехват исключения GeneratorExit полезен для освобождения ресурсов."""
@@ -201,4 +189,6 @@ def example_5():
     print(f'Resource is busy? {resource_is_busy}')
 
 
-example_5()
+if __name__ == '__main__':
+    from examples import main
+    raise SystemExit(main(default=__file__))
@@ -37,9 +37,6 @@ def example_1():
     generator.close()
 
 
-example_1()
-
-
 @example
 def example_2():
     """
@@ -67,9 +64,6 @@ def example_2():
         generator.send(c)
 
 
-example_2()
-
-
 @example
 def example_3():
     """
@@ -94,9 +88,6 @@ def example_3():
     print(generator.send('Third'))
 
 
-example_3()
-
-
 @example
 def example_coroutine():
     """
@@ -122,9 +113,6 @@ def example_coroutine():
         generator.send(c)
 
 
-example_coroutine()
-
-
 def coroutine(func):
     def wrapper(*args, **kwargs):
         generator = func(*args, **kwargs)
@@ -173,9 +161,6 @@ def example_4():
     )
 
 
-example_4()
-
-
 def lines(filename, consumer):
     with open(filename, mode='r', encoding='UTF-8') as file:
         for line in file:
@@ -220,4 +205,14 @@ def example_5():
     )
 
 
-example_5()
+@coroutine
+def broadcast(consumers):
+    while True:
+        item = yield
+        for consumer in consumers:
+            consumer.send(item)
+
+
+if __name__ == '__main__':
+    from examples import main
+    raise SystemExit(main(default=__file__))
@@ -0,0 +1,262 @@
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from itertools import repeat
+from multiprocessing import get_context
+from operator import contains
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from common import make_header
+from dataset import VERSION, generate
+
+pull = import_module('2_generators')
+push = import_module('5_generators_send')
+coroutine = push.coroutine
+
+PATTERN = 'Barbara'
+
+
+def is_adult(item):
+    return float(item['age']) >= 18
+
+
+# Query "survivors": adult first class female survivors, as in
+# 2_generators.example_4
+def survivors_pull(filename):
+    stream = pull.tokens(pull.lines(filename))
+    stream = pull.where('class', '1st', stream)
+    stream = pull.where('sex', 'female', stream)
+    stream = pull.where('survived', '1', stream)
+    stream = pull.nvl('age', '0', stream)
+    return sum(1 for _ in filter(is_adult, stream))
+
+
+@coroutine
+def tokens(consumer):
+    tokens = ('name', 'class', 'age', 'sex', 'survived')
+    while True:
+        item = yield
+        name, *values = item.strip().rsplit(',', maxsplit=4)
+
+        last, _, first = name.strip('"').partition(', ')
+        name = f'{first} {last}'
+
+        consumer.send(dict(zip(tokens, (name, *values))))
+
+
+@coroutine
+def where(key, value, consumer):
+    while True:
+        item = yield
+        if item[key] == value:
+            consumer.send(item)
+
+
+@coroutine
+def nvl(key, default, consumer):
+    while True:
+        item = yield
+        if not item[key]:
+            item[key] = default
+        consumer.send(item)
+
+
+@coroutine
+def select(predicate, consumer):
+    while True:
+        item = yield
+        if predicate(item):
+            consumer.send(item)
+
+
+@coroutine
+def counter(total):
+    while True:
+        yield
+        total[0] += 1
+
+
+def survivors_push(filename):
+    total = [0]
+    push.lines(
+        filename,
+        tokens(
+            where('class', '1st',
+                  where('sex', 'female',
+                        where('survived', '1',
+                              nvl('age', '0',
+                                  select(is_adult, counter(total)))))))
+    )
+    return total[0]
+
+
+def survivors_loop(filename):
+    total = 0
+    with open(filename, mode='r', encoding='UTF-8') as file:
+        for line in file:
+            _, cls, age, sex, survived = line.rstrip().rsplit(',', 4)
+            if cls == '1st' and sex == 'female' and survived == '1':
+                if float(age or '0') >= 18:
+                    total += 1
+    return total
+
+
+def survivors_itertools(filename):
+    with open(filename, mode='r', encoding='UTF-8') as file:
+        records = (x.rstrip().rsplit(',', 4)[1:] for x in file)
+        chosen = filter(lambda x: x[0] == '1st' and x[2] == 'female'
+                        and x[3] == '1', records)
+        return sum(map(lambda x: float(x[1] or '0') >= 18, chosen))
+
+
+# Query "grep": lines containing PATTERN, as in 5_generators_send.example_4
+def grep_pull(filename):
+    stream = filter(lambda x: PATTERN in x, pull.lines(filename))
+    return sum(1 for _ in stream)
+
+
+def grep_push(filename):
+    total = [0]
+    push.lines(filename, push.grep(PATTERN, counter(total)))
+    return total[0]
+
+
+def grep_loop(filename):
+    total = 0
+    with open(filename, mode='r', encoding='UTF-8') as file:
+        for line in file:
+            if PATTERN in line:
+                total += 1
+    return total
+
+
+def grep_itertools(filename):
+    with open(filename, mode='r', encoding='UTF-8') as file:
+        return sum(map(contains, file, repeat(PATTERN)))
+
+
+QUERIES = {
+    'survivors': {
+        'pull': survivors_pull,
+        'push': survivors_push,
+        'loop': survivors_loop,
+        'itertools': survivors_itertools,
+    },
+    'grep': {
+        'pull': grep_pull,
+        'push': grep_push,
+        'loop': grep_loop,
+        'itertools': grep_itertools,
+    },
+}
+
+
+def peak_rss():
+    # On Linux ru_maxrss survives exec and so reports the parent's peak,
+    # VmHWM belongs to the current address space only
+    try:
+        with open('/proc/self/status', mode='r', encoding='UTF-8') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    # Kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def measure(query, style, filename):
+    start = perf_counter()
+    result = QUERIES[query][style](filename)
+    elapsed = perf_counter() - start
+
+    return result, elapsed, peak_rss()
+
+
+def run(query, style, filename):
+    # A fresh process per run, otherwise peak RSS is shared between runs
+    with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(measure, query, style, filename).result()
+
+
+def cached_dataset(directory, rows, seed, jobs=0):
+    # Keyed by the generator version too, so that files produced by an older
+    # dataset.py are never compared with current ones
+    name = f'titanic_v{VERSION}_{rows}_{seed}.csv'
+    filename = os.path.join(directory, name)
+    if os.path.exists(filename):
+        return filename
+
+    # Generated aside and moved into place when complete, so an interrupted
+    # run never leaves a truncated dataset to be reused later
+    os.makedirs(directory, exist_ok=True)
+    part = f'{filename}.part'
+    try:
+        generate(part, rows, seed=seed, fmt='csv', jobs=jobs)
+        os.replace(part, filename)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+    return filename
+
+
+def main(argv=None):
+    parser = ArgumentParser(
+        description='Compare pull, push, loop and itertools pipelines.')
+    parser.add_argument('--rows', type=lambda x: int(float(x)), nargs='+',
+                        default=[10**4, 10**5, 10**6])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', default='data',
+                        help='directory for the generated datasets')
+    parser.add_argument('--query', choices=sorted(QUERIES), nargs='+',
+                        default=list(QUERIES))
+    parser.add_argument('--jobs', type=int, default=0, metavar='N',
+                        help='generate datasets in N worker processes')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    results = []
+
+    print(make_header('BENCHMARK'))
+    print(f'{"query":<10} {"style":<10} {"rows":>10} {"result":>8} '
+          f'{"rows/s":>12} {"peak MiB":>9}')
+
+    for rows in args.rows:
+        filename = cached_dataset(args.data, rows, args.seed,
+                                  jobs=args.jobs)
+
+        for query in args.query:
+            for style in QUERIES[query]:
+                result, elapsed, peak = run(query, style, filename)
+                results.append({
+                    'query': query, 'style': style, 'rows': rows,
+                    'result': result, 'seconds': elapsed,
+                    'rows_per_second': rows / elapsed, 'peak_rss': peak,
+                })
+
+                peak = '-' if peak is None else f'{peak / 2**20:.1f}'
+                print(f'{query:<10} {style:<10} {rows:>10} {result:>8} '
+                      f'{rows / elapsed:>12,.0f} {peak:>9}')
+
+    print(make_header(''))
+
+    if args.json:
+        with open(args.json, mode='w', encoding='UTF-8') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 import inspect
-from functools import wraps
+import os
+import sys
+from functools import lru_cache, wraps
 
 
 def make_header(text, width=80, filler='-'):
@@ -18,17 +20,33 @@ def make_header(text, width=80, filler='-'):
     return ' '.join((start, text, end))
 
 
-def example(func):
-    @wraps(func)
-    def wrapper():
-        code, _ = inspect.getsourcelines(func)
-        _dec, _def, *body = code
+registry = {}
+
+
+def module_name(func):
+    module = sys.modules[func.__module__]
+    filename = getattr(module, '__file__', None) or func.__module__
+    name, _ = os.path.splitext(os.path.basename(filename))
+
+    return name
 
-        print(make_header(func.__name__.upper()))
 
-        print(inspect.cleandoc(''.join(body)))
+@lru_cache(maxsize=None)
+def render(func):
+    code, _ = inspect.getsourcelines(func)
+    _dec, _def, *body = code
 
-        print(make_header('OUTPUT:'))
+    return '\n'.join((
+        make_header(func.__name__.upper()),
+        inspect.cleandoc(''.join(body)),
+        make_header('OUTPUT:'),
+    ))
+
+
+def example(func):
+    @wraps(func)
+    def wrapper():
+        print(render(func))
 
         retval = func()
         if retval is not None:
@@ -36,4 +54,7 @@ def example(func):
 
         print(make_header(''), '\n')
 
+    # Examples are only registered here, see examples.py for the runner
+    registry.setdefault(module_name(func), {})[func.__name__] = wrapper
+
     return wrapper
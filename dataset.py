@@ -0,0 +1,168 @@
+import json
+import os
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+
+# Bump whenever the generated data changes, cached datasets are keyed by it
+VERSION = 1
+
+# Shaped after titanic.csv: class shares, share of missing ages, survival
+# rates by class and sex, a few legacy rows with unquoted names and no class
+CLASSES = (('1st', 0.25), ('2nd', 0.21), ('3rd', 0.54))
+SURVIVAL = {
+    ('1st', 'female'): 0.93, ('1st', 'male'): 0.33,
+    ('2nd', 'female'): 0.88, ('2nd', 'male'): 0.14,
+    ('3rd', 'female'): 0.38, ('3rd', 'male'): 0.12,
+}
+MISSING_AGE = 0.42
+UNQUOTED = 0.0015
+BLOCK = 100000
+
+SURNAMES = (
+    'Allen', 'Allison', 'Anderson', 'Andersson', 'Brown', 'Carlsson',
+    'Carter', 'Chapman', 'Collander', 'Davies', 'Ford', 'Goodwin', 'Harris',
+    'Hocking', 'Johansson', 'Johnson', 'Kelly', 'Khalil', "O'Brien",
+    "O'Connor", 'Olsen', 'Radeff', 'Richard', 'Ryerson', 'Sage', 'Smith',
+    'Strom', 'Thomas', 'Williams', 'Wilson',
+)
+MALE_NAMES = (
+    'Albert', 'Alexander', 'Arthur', 'Charles', 'Christopher', 'Emil',
+    'Erik', 'Frans', 'Frederick', 'George', 'Henry', 'Hudson', 'John',
+    'Joseph', 'Kurt', 'Maurice', 'Oscar', 'Ramon', 'Robert', 'Samuel',
+    'Thomas', 'William',
+)
+FEMALE_NAMES = (
+    'Anna', 'Barbara', 'Catherine', 'Delia', 'Elisabeth', 'Elizabeth',
+    'Ellen', 'Helen', 'Ida', 'Margaret', 'Mary', 'Saude',
+)
+MALE_TITLES = (('Mr', 0.9), ('Master', 0.07), ('Rev', 0.015), ('Dr', 0.015))
+FEMALE_TITLES = (('Miss', 0.5), ('Mrs', 0.45), ('Ms', 0.05))
+
+
+def weighted(rng, pairs):
+    point = rng.random()
+    for value, weight in pairs:
+        point -= weight
+        if point < 0:
+            return value
+    return pairs[-1][0]
+
+
+def age(rng, title):
+    if rng.random() < MISSING_AGE:
+        return None
+    if title == 'Master' or rng.random() < 0.03:
+        # Infants are written with a fraction, e.g. 0.83
+        return round(rng.uniform(0.1, 12), 2 if rng.random() < 0.5 else 0)
+    return rng.randint(14, 71)
+
+
+def name(rng, sex, title):
+    last = rng.choice(SURNAMES)
+    if sex == 'male':
+        first = ' '.join(rng.sample(MALE_NAMES, rng.randint(1, 3)))
+        return last, title, first
+
+    first = ' '.join(rng.sample(FEMALE_NAMES, rng.randint(1, 2)))
+    if title == 'Mrs':
+        # Married women are listed under the husband's name
+        husband = rng.choice(MALE_NAMES)
+        return last, title, f'{husband} ({first} {rng.choice(SURNAMES)})'
+    return last, title, first
+
+
+def block(seed, index, size=BLOCK):
+    # Every block has its own generator, so blocks can be produced in any
+    # order or in parallel and still give the same file for the same seed
+    rng = Random(f'{seed}:{index}')
+
+    for _ in range(size):
+        cls = weighted(rng, CLASSES)
+        sex = 'female' if rng.random() < 0.35 else 'male'
+        title = weighted(rng, FEMALE_TITLES if sex == 'female'
+                         else MALE_TITLES)
+        survived = int(rng.random() < SURVIVAL[cls, sex])
+        last, title, first = name(rng, sex, title)
+
+        if rng.random() < UNQUOTED:
+            yield f'{last} {title} {first}', None, None, sex, survived
+        else:
+            yield f'{last}, {title} {first}', cls, age(rng, title), sex, \
+                survived
+
+
+def to_csv(row):
+    name, cls, age, sex, survived = row
+
+    if ', ' in name:
+        name = f'"{name}"'
+    age = '' if age is None else f'{age:g}'
+
+    return f'{name},{cls or ""},{age},{sex},{survived}\n'
+
+
+def to_jsonl(row):
+    keys = ('name', 'class', 'age', 'sex', 'survived')
+    return json.dumps(dict(zip(keys, row)), ensure_ascii=False) + '\n'
+
+
+FORMATS = {'csv': to_csv, 'jsonl': to_jsonl}
+
+
+def render(seed, index, size, fmt):
+    return ''.join(map(FORMATS[fmt], block(seed, index, size)))
+
+
+def generate(filename, rows, seed=0, fmt=None, jobs=0):
+    if fmt is None:
+        _, ext = os.path.splitext(filename)
+        fmt = ext.lstrip('.') or 'csv'
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown format {fmt!r}, expected one of '
+                         f'{", ".join(sorted(FORMATS))}')
+
+    blocks = (
+        (seed, index, min(BLOCK, rows - index * BLOCK), fmt)
+        for index in range((rows + BLOCK - 1) // BLOCK)
+    )
+
+    with open(filename, mode='w', encoding='UTF-8') as file:
+        if not jobs:
+            file.writelines(render(*x) for x in blocks)
+            return
+
+        # Only a couple of rendered blocks per worker are held in memory
+        with ProcessPoolExecutor(jobs) as pool:
+            pending = deque()
+            for args in blocks:
+                pending.append(pool.submit(render, *args))
+                if len(pending) >= 2 * jobs:
+                    file.write(pending.popleft().result())
+            while pending:
+                file.write(pending.popleft().result())
+
+
+def main(argv=None):
+    parser = ArgumentParser(
+        description='Generate a synthetic titanic-shaped dataset.')
+    parser.add_argument('filename')
+    parser.add_argument('rows', type=lambda x: int(float(x)),
+                        help='number of rows, e.g. 1e6')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=sorted(FORMATS),
+                        help='default: from the file extension')
+    parser.add_argument('--jobs', type=int, default=0, metavar='N',
+                        help='generate blocks in N worker processes')
+    args = parser.parse_args(argv)
+
+    try:
+        generate(args.filename, args.rows, seed=args.seed, fmt=args.format,
+                 jobs=args.jobs)
+    except ValueError as err:
+        parser.error(str(err))
+
+
+if __name__ == '__main__':
+    main()
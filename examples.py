@@ -0,0 +1,293 @@
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from argparse import ArgumentParser, ArgumentTypeError
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+from fnmatch import fnmatchcase
+from functools import partial
+from glob import glob
+from importlib import import_module
+from io import StringIO
+from statistics import mean, stdev
+from time import perf_counter, process_time, sleep
+
+from common import registry
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SAMPLE = 0.02
+PEAK_FLOOR = 1 << 14
+RETRIES = 3
+REFERENCE_RUNS = 3
+RETRY_PAUSE = 1.0
+
+
+def stem(filename):
+    name, _ = os.path.splitext(os.path.basename(filename))
+    return name
+
+
+def count(text):
+    value = int(text)
+    if value < 0:
+        raise ArgumentTypeError(f'must not be negative: {text}')
+    return value
+
+
+def quiet():
+    stack = ExitStack()
+    devnull = stack.enter_context(open(os.devnull, mode='w'))
+    stack.enter_context(redirect_stdout(devnull))
+    stack.enter_context(redirect_stderr(devnull))
+    return stack
+
+
+def discover():
+    for filename in sorted(glob(os.path.join(ROOT, '[0-9]_*.py'))):
+        # A module run as a script has already registered its examples
+        if stem(filename) not in registry:
+            import_module(stem(filename))
+
+
+def select(selectors):
+    for module in sorted(registry):
+        for name in registry[module]:
+            key = f'{module}.{name}'
+            if any(fnmatchcase(key, x) or fnmatchcase(module, x)
+                   for x in selectors):
+                yield key
+
+
+def lookup(key):
+    module, name = key.split('.')
+    if module not in registry:
+        import_module(module)
+
+    return registry[module][name]
+
+
+def reference():
+    # Fixed workload measured next to every example, so that a machine that
+    # has become slower as a whole is not taken for a regression
+    return sum(x * x for x in range(1000))
+
+
+def autorange(func, target=SAMPLE):
+    # As timeit.Timer.autorange: find how many calls make a sample long
+    # enough for timer resolution and scheduler noise not to matter
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        if perf_counter() - start >= target:
+            return number
+        number *= 2
+
+
+def measure(func, repeat):
+    wall, cpu = [], []
+
+    with quiet():
+        # As timeit does, keep collections of garbage left by other
+        # examples out of the numbers
+        gc.collect()
+        gc.disable()
+        try:
+            number = autorange(func)
+            for _ in range(repeat):
+                start_wall, start_cpu = perf_counter(), process_time()
+                for _ in range(number):
+                    func()
+                wall.append((perf_counter() - start_wall) / number)
+                cpu.append((process_time() - start_cpu) / number)
+        finally:
+            gc.enable()
+
+        # Separate run, tracemalloc slows everything down
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'runs': repeat,
+        'loops': number,
+        'wall': summarize(wall),
+        'cpu': summarize(cpu),
+        'peak': peak,
+    }
+
+
+def summarize(samples):
+    return {
+        'min': min(samples),
+        'mean': mean(samples),
+        'stdev': stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def compare(current, baseline, threshold):
+    regressions = []
+
+    for metric in ('wall', 'cpu'):
+        old, new = baseline[metric]['min'], current[metric]['min']
+        if 'reference' in baseline and 'reference' in current:
+            old *= current['reference'][metric] / baseline['reference'][metric]
+        if new > old * (1 + threshold):
+            regressions.append(f'{metric} {old:.3g}s -> {new:.3g}s')
+
+    old, new = baseline['peak'], current['peak']
+    if new - old > max(old * threshold, PEAK_FLOOR):
+        regressions.append(f'peak {old}B -> {new}B')
+
+    return regressions
+
+
+def load_results(filename):
+    if not filename or not os.path.exists(filename):
+        return {}
+
+    with open(filename, mode='r', encoding='UTF-8') as file:
+        return json.load(file)
+
+
+def run(key, benchmark=0, capture=False):
+    func = lookup(key)
+
+    if benchmark:
+        metrics = measure(func.__wrapped__, benchmark)
+        speed = measure(reference, REFERENCE_RUNS)
+        metrics['reference'] = {x: speed[x]['min'] for x in ('wall', 'cpu')}
+        return metrics
+
+    if not capture:
+        return func()
+
+    # Kept apart, so that worker output ends up on the same streams as it
+    # would without --jobs
+    with StringIO() as out, StringIO() as err, redirect_stdout(out), \
+            redirect_stderr(err):
+        func()
+        return out.getvalue(), err.getvalue()
+
+
+def execute(keys, jobs=0, benchmark=0):
+    task = partial(run, benchmark=benchmark, capture=bool(jobs))
+
+    if not jobs:
+        yield from map(task, keys)
+        return
+
+    # Results are collected in the original order, whichever worker finishes
+    with ProcessPoolExecutor(jobs) as pool:
+        yield from pool.map(task, keys)
+
+
+def confirm(results, baseline, threshold, repeat, retries=RETRIES):
+    # A busy machine may be slow for seconds at a time, so suspected
+    # regressions are measured again a little later and the best numbers
+    # are kept. The number of attempts is recorded in the results.
+    for _ in range(retries):
+        suspects = [
+            key for key, current in results.items()
+            if key in baseline
+            and compare(current, baseline[key], threshold)
+        ]
+        if not suspects:
+            return
+
+        sleep(RETRY_PAUSE)
+        for key in suspects:
+            again = run(key, benchmark=repeat)
+            best = min(results[key], again, key=lambda x: x['wall']['min'])
+            best['peak'] = min(results[key]['peak'], again['peak'])
+            best['remeasured'] = results[key].get('remeasured', 0) + 1
+            results[key] = best
+
+
+def report(results, baseline=None, threshold=0.1, filename=None):
+    baseline = load_results(baseline)
+    failed = 0
+
+    for key, current in results.items():
+        if key not in baseline:
+            continue
+
+        regressions = compare(current, baseline[key], threshold)
+        current['regressions'] = regressions
+        for regression in regressions:
+            print(f'REGRESSION {key}: {regression}', file=sys.stderr)
+        failed += bool(regressions)
+
+    if not filename:
+        print(json.dumps(results, indent=2))
+        return failed
+
+    # Merge, so that several runs may share one results file
+    merged = load_results(filename)
+    merged.update(results)
+    with open(filename, mode='w', encoding='UTF-8') as file:
+        json.dump(merged, file, indent=2)
+
+    return failed
+
+
+def main(argv=None, default=None):
+    env = os.environ.get
+
+    parser = ArgumentParser(prog='python -m examples',
+                            description='List, run or benchmark examples.')
+    parser.add_argument('selectors', nargs='*', metavar='MODULE[.NAME]',
+                        help='glob patterns, e.g. 2_generators or *.example_4')
+    parser.add_argument('--list', action='store_true')
+    parser.add_argument('--jobs', type=count, default=0, metavar='N',
+                        help='run examples in N worker processes')
+    parser.add_argument('--benchmark', type=count, metavar='N',
+                        default=env('EXAMPLES_BENCHMARK', '0'))
+    parser.add_argument('--baseline', default=env('EXAMPLES_BASELINE'))
+    parser.add_argument('--threshold', type=float,
+                        default=float(env('EXAMPLES_THRESHOLD', 0.1)))
+    parser.add_argument('--results', default=env('EXAMPLES_RESULTS'))
+    args = parser.parse_args(argv)
+
+    # Concurrent workers would compete for CPU and skew the numbers
+    if args.jobs and args.benchmark:
+        parser.error('--jobs cannot be combined with --benchmark')
+
+    discover()
+
+    selectors = args.selectors or ([stem(default)] if default else ['*'])
+    keys = list(select(selectors))
+    if not keys:
+        parser.error(f'no examples match {" ".join(selectors)}')
+
+    if args.list:
+        print(*keys, sep='\n')
+        return 0
+
+    outputs = execute(keys, jobs=args.jobs, benchmark=args.benchmark)
+
+    if args.benchmark:
+        results = dict(zip(keys, outputs))
+        confirm(results, load_results(args.baseline), args.threshold,
+                args.benchmark)
+        failed = report(results, baseline=args.baseline,
+                        threshold=args.threshold, filename=args.results)
+        return int(bool(failed))
+
+    for output in outputs:
+        if output is not None:
+            out, err = output
+            sys.stdout.write(out)
+            sys.stderr.write(err)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
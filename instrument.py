@@ -0,0 +1,184 @@
+import os
+from time import perf_counter
+
+from common import make_header
+
+
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.depth = 0
+        self.items_in = 0
+        self.items_out = 0
+        self.time = 0.0
+
+    @property
+    def selectivity(self):
+        if not self.items_in:
+            return None
+        return self.items_out / self.items_in
+
+
+class Push:
+    def __init__(self, profiler, stage, target):
+        self.profiler = profiler
+        self.stage = stage
+        self.target = target
+
+    def send(self, item):
+        profiler = self.profiler
+        if profiler.stack:
+            profiler.stack[-1].items_out += 1
+
+        self.stage.items_in += 1
+        profiler.enter(self.stage)
+        try:
+            return self.target.send(item)
+        finally:
+            profiler.exit()
+
+    def throw(self, *args):
+        return self.target.throw(*args)
+
+    def close(self):
+        self.target.close()
+
+
+# Every stage of a pipeline is wrapped with pull (iterators) or push
+# (@coroutine consumers). Time spent in upstream or downstream stages is
+# charged to those stages, so each stage only gets its own time. Stages
+# with the same name are merged. When disabled, pull and push return the
+# original objects, so instrumentation costs nothing.
+class Profiler:
+    def __init__(self, enabled=None):
+        if enabled is None:
+            enabled = bool(os.environ.get('PIPELINE_PROFILE'))
+
+        self.enabled = enabled
+        self.stages = {}
+        self.stack = []
+        self.mark = 0.0
+
+    def stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = Stage(name)
+        return self.stages[name]
+
+    def enter(self, stage):
+        now = perf_counter()
+        if self.stack:
+            self.stack[-1].time += now - self.mark
+
+        self.stack.append(stage)
+        stage.depth = max(stage.depth, len(self.stack))
+        self.mark = now
+
+    def exit(self):
+        now = perf_counter()
+        self.stack.pop().time += now - self.mark
+        self.mark = now
+
+    def pull(self, name, stream):
+        if not self.enabled:
+            return stream
+        return self._pull(self.stage(name), iter(stream))
+
+    def _pull(self, stage, stream):
+        try:
+            while True:
+                self.enter(stage)
+                try:
+                    item = next(stream)
+                except StopIteration:
+                    return
+                finally:
+                    self.exit()
+
+                stage.items_out += 1
+                if self.stack:
+                    self.stack[-1].items_in += 1
+
+                yield item
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
+
+    def push(self, name, target):
+        if not self.enabled:
+            return target
+        return Push(self, self.stage(name), target)
+
+    def summary(self):
+        total = sum(x.time for x in self.stages.values()) or 1.0
+
+        yield make_header('PIPELINE PROFILE')
+        yield (f'{"stage":<24} {"in":>10} {"out":>10} {"select":>7} '
+               f'{"excl ms":>10} {"share":>6}')
+
+        # Outermost stages first, like the bottom of a flame graph
+        for stage in sorted(self.stages.values(), key=lambda x: x.depth):
+            indent = ' ' * (stage.depth - 1)
+            share = stage.time / total
+            selectivity = stage.selectivity
+            selectivity = '-' if selectivity is None else f'{selectivity:.3f}'
+
+            yield (f'{indent + stage.name:<24} {stage.items_in:>10} '
+                   f'{stage.items_out:>10} {selectivity:>7} '
+                   f'{stage.time * 1000:>10.3f} {share:>6.1%} '
+                   f'{"#" * round(share * 20)}').rstrip()
+
+        yield make_header('')
+
+    def close(self, file=None):
+        if self.enabled and self.stages:
+            print(*self.summary(), sep='\n', file=file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def feed(stream, consumer):
+    # Push source over any iterator, so that the source itself can be timed
+    # by wrapping the iterator with Profiler.pull
+    for item in stream:
+        consumer.send(item)
+
+
+def main():
+    from importlib import import_module
+
+    pull = import_module('2_generators')
+    push = import_module('5_generators_send')
+
+    with Profiler(enabled=True) as profiler:
+        stream = profiler.pull('lines', pull.lines('titanic.csv'))
+        stream = profiler.pull('tokens', pull.tokens(stream))
+        stream = profiler.pull('where class',
+                               pull.where('class', '1st', stream))
+        stream = profiler.pull('where sex',
+                               pull.where('sex', 'female', stream))
+        stream = profiler.pull('where survived',
+                               pull.where('survived', '1', stream))
+        stream = profiler.pull('nvl', pull.nvl('age', '0', stream))
+
+        adults = filter(lambda x: float(x['age']) >= 18, stream)
+        print(f'Adult first class female survivors: {len(list(adults))}')
+
+    with Profiler(enabled=True) as profiler:
+        source = profiler.pull('lines', pull.lines('titanic.csv'))
+        sink = profiler.push('printer', push.printer())
+        feed(
+            source,
+            profiler.push('broadcast', push.broadcast([
+                profiler.push('grep', push.grep('Barbara', sink)),
+                profiler.push('grep', push.grep('Christopher', sink)),
+                profiler.push('grep', push.grep('Ramon', sink)),
+            ]))
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import codecs
+import os
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from multiprocessing import get_context
+
+CHUNK = 1 << 20
+
+
+def walk(root):
+    # Sorted at every level, so the output order does not depend on the
+    # filesystem. Hidden directories (.git and friends) are skipped, as are
+    # directories that cannot be listed or vanish during the walk.
+    try:
+        with os.scandir(root) as entries:
+            entries = sorted(entries, key=lambda x: x.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name.startswith('.'):
+                continue
+            yield from walk(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            yield entry.path
+
+
+def rewrite(strs, pattern, replacement, prefix='#'):
+    # Same pipeline as 1_generator_expressions.example_5, keeping line numbers
+    numbered = enumerate(strs, start=1)
+    if prefix is not None:
+        numbered = filter(lambda x: x[1].lstrip().startswith(prefix), numbered)
+    found = filter(lambda x: pattern in x[1], numbered)
+    return map(lambda x: (*x, x[1].replace(pattern, replacement)), found)
+
+
+def lines(path, encoding='UTF-8'):
+    try:
+        with open(path, mode='r', encoding=encoding, errors='replace') as file:
+            yield from file
+    except (OSError, UnicodeError):
+        # Unreadable, or e.g. a utf-16 file without a BOM
+        return
+
+
+def match(path, pattern, replacement, prefix='#', encoding='UTF-8'):
+    return rewrite(lines(path, encoding), pattern, replacement, prefix)
+
+
+def scan(path, needle, chunk=CHUNK):
+    # Cheap byte-level prefilter: most files never get decoded at all.
+    # Files are read in chunks, keeping enough of the previous chunk to find
+    # a needle split between two of them.
+    keep = len(needle) - 1
+    tail = b''
+
+    try:
+        with open(path, mode='rb') as file:
+            while True:
+                block = file.read(chunk)
+                if not block:
+                    return False
+                if needle in tail + block:
+                    return True
+                tail = block[-keep:] if keep else b''
+    except OSError:
+        return False
+
+
+def files(root):
+    # A file root is searched as is. Unlike directories met during the walk,
+    # a root that is missing or cannot be listed is an error.
+    if os.path.isfile(root):
+        return iter([root])
+
+    with os.scandir(root):
+        pass
+
+    return walk(root)
+
+
+def search(root, pattern, replacement, prefix='#', threads=8, processes=0,
+           window=256, encoding='UTF-8'):
+    if not pattern:
+        raise ValueError('pattern must not be empty')
+
+    # Checked here rather than on the first next() of the generator
+    paths = files(root)
+
+    return _search(paths, pattern, replacement, prefix, threads, processes,
+                   window, encoding)
+
+
+def _search(paths, pattern, replacement, prefix, threads, processes, window,
+            encoding):
+    # The BOM of utf-16/utf-32 is emitted on the first call only, prime the
+    # encoder with an empty string so that the needle does not start with it
+    encoder = codecs.getincrementalencoder(encoding)()
+    encoder.encode('')
+    needle = encoder.encode(pattern)
+    matcher = partial(match, pattern=pattern, replacement=replacement,
+                      prefix=prefix, encoding=encoding)
+
+    with ExitStack() as stack:
+        task = partial(_local, needle, matcher)
+        if processes:
+            # Workers are started lazily from the reader threads, forking
+            # there could deadlock on locks held by the other threads
+            procs = stack.enter_context(ProcessPoolExecutor(
+                processes, mp_context=get_context('spawn')))
+            task = partial(_remote, procs, needle, matcher)
+
+        pool = stack.enter_context(ThreadPoolExecutor(threads))
+
+        # At most `window` files are in flight, results leave in walk order
+        pending = deque()
+        try:
+            for path in paths:
+                pending.append((path, pool.submit(task, path)))
+                if len(pending) >= window:
+                    yield from _results(*pending.popleft())
+            while pending:
+                yield from _results(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _collect(matcher, path):
+    # Lines are streamed, only the matches are held in memory
+    return list(matcher(path))
+
+
+def _local(needle, matcher, path):
+    if not scan(path, needle):
+        return []
+    return _collect(matcher, path)
+
+
+def _remote(procs, needle, matcher, path):
+    # Only the path crosses the process boundary, the worker reads the file
+    if not scan(path, needle):
+        return []
+    return procs.submit(_collect, matcher, path).result()
+
+
+def _results(path, found):
+    for lineno, line, replaced in found.result():
+        yield path, lineno, line, replaced
+
+
+def main(argv=None):
+    parser = ArgumentParser(
+        description='Stream search-and-replace over a directory tree.')
+    parser.add_argument('root')
+    parser.add_argument('pattern')
+    parser.add_argument('replacement')
+    parser.add_argument('--prefix', default='#',
+                        help='only rewrite lines starting with this prefix')
+    parser.add_argument('--all-lines', dest='prefix', action='store_const',
+                        const=None, help='rewrite any line')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=0)
+    parser.add_argument('--window', type=int, default=256)
+    parser.add_argument('--encoding', default='UTF-8')
+    args = parser.parse_args(argv)
+
+    try:
+        results = search(args.root, args.pattern, args.replacement,
+                         prefix=args.prefix, threads=args.threads,
+                         processes=args.processes, window=args.window,
+                         encoding=args.encoding)
+    except (OSError, ValueError) as err:
+        parser.error(str(err))
+
+    for path, lineno, _, replaced in results:
+        print(f'{path}:{lineno}:{replaced.rstrip()}')
+
+
+if __name__ == '__main__':
+    main()